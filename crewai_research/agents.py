@@ -1,101 +1,139 @@
+import os
+import sys
 from crewai import Agent
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_openai import ChatOpenAI
+from perf_config import get_config
 # Tools are optional - uncomment if you have API keys for them
 # from crewai_tools import SerperDevTool, WebsiteSearchTool
 # search_tool = SerperDevTool()  # Requires SERPER_API_KEY in .env
 # web_tool = WebsiteSearchTool()
 
+def verbose_enabled():
+    """Whether crewai should log every agent step (PerfConfig.verbose); off by default."""
+    return get_config().verbose
+
+class TokenStreamHandler(BaseCallbackHandler):
+    """Echoes LLM tokens to the current sys.stdout as they are generated."""
+
+    def on_llm_new_token(self, token, **kwargs):
+        # Looked up per token so tokens follow main's stdout tee when it is installed
+        sys.stdout.write(token)
+
+    def on_llm_end(self, response, **kwargs):
+        # End the streamed answer's line so a line-buffered stdout emits it
+        sys.stdout.write("\n")
+
+def _persona(text):
+    """Strip source indentation so the persona prompt is compact and byte-stable."""
+    return "\n".join(line.strip() for line in text.strip().splitlines())
+
+def _llm(cache_key):
+    """Chat model for one agent.
+
+    crewai puts role, backstory and goal at the very start of every prompt, so
+    each call for an agent begins with the same bytes. OpenAI caches repeated
+    prompt prefixes automatically; the cache key keeps an agent's calls routed
+    to the same cache across its iterations and tasks.
+    """
+    config = get_config()
+    return ChatOpenAI(
+        model=os.environ.get("OPENAI_MODEL_NAME", "gpt-4o"),
+        model_kwargs={"extra_body": {"prompt_cache_key": cache_key}} if config.prompt_cache else {},
+        streaming=config.streaming,
+        callbacks=[TokenStreamHandler()] if config.streaming else None
+    )
+
+def _tool_free_agent(**kwargs):
+    """Agent without tools that answers each task in one LLM round-trip.
+
+    With no tools to call, further iterations only re-prompt the model. The
+    second iteration is a retry for answers that miss the "Final Answer:"
+    format; a well-formed answer ends the task after the first call. Agents
+    that get tools (e.g. SerperDevTool) should be built with Agent directly and
+    a higher max_iter.
+    """
+    return Agent(**kwargs, tools=[], allow_delegation=False, max_iter=2)
+
 class BasketballLeagueAgents:
     def market_researcher(self):
-        return Agent(
+        return _tool_free_agent(
             role="Market Research Analyst",
             goal="Analyze existing basketball league management solutions and identify market opportunities",
-            backstory="""You are an expert market researcher specializing in sports technology 
-            and youth sports management platforms. You have deep knowledge of the competitive 
-            landscape and understand what makes sports leagues successful. You're skilled at 
-            identifying market gaps and opportunities.""",
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
+            backstory=_persona("""- Sports technology market researcher
+            - Focus: youth sports management platforms
+            - Knows the competitive landscape and what makes leagues succeed
+            - Finds market gaps and opportunities"""),
+            verbose=verbose_enabled(),
+            llm=_llm("market_researcher")
         )
     
     def ux_researcher(self):
-        return Agent(
+        return _tool_free_agent(
             role="UX Research Specialist",
             goal="Define user personas, needs, and journey maps for basketball league stakeholders",
-            backstory="""You are a UX researcher with extensive experience in sports applications 
-            and community platforms. You understand the needs of parents, coaches, players, league 
-            administrators, and referees. You excel at creating detailed user personas and 
-            identifying pain points in current solutions.""",
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
+            backstory=_persona("""- UX researcher for sports and community apps
+            - Knows the needs of parents, coaches, players, league admins and referees
+            - Builds detailed personas and pinpoints pain points in current tools"""),
+            verbose=verbose_enabled(),
+            llm=_llm("ux_researcher")
         )
     
     def technical_architect(self):
-        return Agent(
+        return _tool_free_agent(
             role="Technical Architecture Expert",
             goal="Design scalable technical architecture for basketball league management platform",
-            backstory="""You are a senior technical architect with expertise in building scalable 
-            SaaS platforms. You have experience with real-time sports applications, mobile development, 
-            and handling complex scheduling algorithms. You understand cloud infrastructure, 
-            database design, and API architecture.""",
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
+            backstory=_persona("""- Senior architect for scalable SaaS platforms
+            - Real-time sports apps, mobile, complex scheduling algorithms
+            - Cloud infrastructure, database design, API architecture"""),
+            verbose=verbose_enabled(),
+            llm=_llm("technical_architect")
         )
     
     def feature_analyst(self):
-        return Agent(
+        return _tool_free_agent(
             role="Feature Priority Analyst",
             goal="Define and prioritize features based on user needs and technical feasibility",
-            backstory="""You are a product analyst specializing in sports management software. 
-            You excel at breaking down complex requirements into actionable features and creating 
-            priority matrices based on user value and implementation effort. You understand 
-            MVP development and iterative product delivery.""",
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
+            backstory=_persona("""- Product analyst for sports management software
+            - Turns complex requirements into actionable features
+            - Prioritizes by user value vs. implementation effort
+            - MVP-first, iterative delivery"""),
+            verbose=verbose_enabled(),
+            llm=_llm("feature_analyst")
         )
     
     def compliance_expert(self):
-        return Agent(
+        return _tool_free_agent(
             role="Youth Sports Compliance and Safety Expert",
             goal="Ensure all legal, safety, and compliance requirements for youth sports are addressed",
-            backstory="""You are an expert in youth sports regulations, child safety online (COPPA), 
-            data privacy laws, and sports organization compliance. You understand background check 
-            requirements, insurance needs, and safety protocols for youth sports leagues. 
-            You're familiar with both national and state-specific requirements.""",
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
+            backstory=_persona("""- Youth sports regulation and child online safety (COPPA) expert
+            - Data privacy law and sports organization compliance
+            - Background checks, insurance, safety protocols
+            - National and state-specific requirements"""),
+            verbose=verbose_enabled(),
+            llm=_llm("compliance_expert")
         )
     
     def business_strategist(self):
-        return Agent(
+        return _tool_free_agent(
             role="Business Strategy Consultant",
             goal="Develop monetization strategy and business model for sustainable growth",
-            backstory="""You are a business strategist with deep experience in SaaS platforms 
-            and sports technology. You understand various monetization models, pricing strategies, 
-            and growth tactics for B2B2C platforms. You can analyze unit economics and create 
-            sustainable business models.""",
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
+            backstory=_persona("""- SaaS and sports technology business strategist
+            - Monetization models, pricing and B2B2C growth tactics
+            - Unit economics and sustainable business models"""),
+            verbose=verbose_enabled(),
+            llm=_llm("business_strategist")
         )
     
     def ui_designer(self):
-        return Agent(
+        return _tool_free_agent(
             role="UI/Visual Design Specialist",
             goal="Create comprehensive UI design system and interface specifications for basketball league platform",
-            backstory="""You are a senior UI designer specializing in sports applications 
-            and mobile-first design. You have extensive experience designing interfaces for 
-            diverse user groups from tech-savvy teenagers to parent volunteers. You understand 
-            modern design trends, accessibility standards (WCAG 2.1), and how to create 
-            design systems that scale. You're skilled at creating interfaces that are both 
-            visually appealing and highly functional, with expertise in color psychology, 
-            typography, interaction design, and responsive layouts. You know how to balance 
-            fun, engaging elements for youth with professional needs of league administrators.""",
-            verbose=True,
-            allow_delegation=False,
-            max_iter=3
+            backstory=_persona("""- Senior UI designer, sports apps, mobile-first
+            - Designs for everyone from teens to parent volunteers
+            - WCAG 2.1 AA, design systems that scale
+            - Color, typography, interaction, responsive layouts
+            - Balances youth playfulness with admin professionalism"""),
+            verbose=verbose_enabled(),
+            llm=_llm("ui_designer")
         )
\ No newline at end of file
@@ -0,0 +1,98 @@
+import io
+import json
+import logging
+import os
+import time
+from openai import OpenAI, OpenAIError
+from crewai.tasks.task_output import TaskOutput
+
+warn = logging.getLogger("crew").warning
+
+class BatchCrewRunner:
+    """Runs context-free tasks through the OpenAI Batch API instead of live calls."""
+
+    def __init__(self, model=None, poll_interval=10, max_poll_interval=300):
+        self.client = OpenAI()
+        self.model = model or os.environ.get("OPENAI_MODEL_NAME", "gpt-4o")
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+
+    def build_request(self, custom_id, task):
+        agent = task.agent
+        system_prompt = f"You are {agent.role}. {agent.backstory}\nYour personal goal is: {agent.goal}"
+        return {
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": task.prompt()}
+                ]
+            }
+        }
+
+    def submit(self, tasks):
+        lines = [json.dumps(self.build_request(str(i), task)) for i, task in enumerate(tasks)]
+        batch_file = self.client.files.create(
+            file=("tasks.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+            purpose="batch"
+        )
+        return self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+
+    def wait(self, batch):
+        delay = self.poll_interval
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+        return batch
+
+    def run(self, tasks):
+        """Submit tasks as one batch, wait for it, and set each task's output.
+
+        Returns the tasks that got an output. Whatever the batch could not
+        answer is left without one, so the caller runs it live instead.
+        """
+        tasks = [task for task in tasks if not task.context]
+        if not tasks:
+            return []
+
+        try:
+            batch = self.wait(self.submit(tasks))
+            if batch.status != "completed":
+                warn(f"⚠️ Batch {batch.id} ended as '{batch.status}'; running its tasks live")
+                return []
+            if not batch.output_file_id:
+                warn(f"⚠️ Batch {batch.id} returned no results; running its tasks live")
+                return []
+            content = self.client.files.content(batch.output_file_id).text
+        except OpenAIError as e:
+            warn(f"⚠️ Batch API request failed ({e}); running its tasks live")
+            return []
+
+        results = {}
+        for line in content.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get("response") or {}
+            if response.get("status_code") != 200:
+                continue
+            results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+
+        completed = []
+        for i, task in enumerate(tasks):
+            raw = results.get(str(i))
+            if raw is None:
+                continue
+            task.output = TaskOutput(description=task.description, raw=raw, agent=task.agent.role)
+            completed.append(task)
+        if len(completed) < len(tasks):
+            warn(f"⚠️ {len(tasks) - len(completed)} of {len(tasks)} batch requests failed; running them live")
+        return completed
@@ -0,0 +1,187 @@
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+CACHE_DIR = Path.home() / ".crewai_research_cache"
+SIMILARITY_THRESHOLD = 0.92
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+def context_chain(task):
+    """SHA-256 of each upstream context output in context order (None if it has not run)."""
+    return [
+        ctx.output and hashlib.sha256(ctx.output.raw.encode("utf-8")).hexdigest()
+        for ctx in task.context or []
+    ]
+
+def _model_name(agent):
+    return getattr(agent.llm, "model_name", None)
+
+class LLMCache:
+    """File-backed cache of task results keyed on agent persona, model, task and context.
+
+    With ``semantic=True`` a miss on the exact key falls back to the cached
+    result of the same agent whose task description embedding is closest,
+    provided the cosine similarity clears ``threshold`` and the entry was
+    produced from exactly the same upstream outputs. This needs the
+    optional ``sentence-transformers`` package. Description embeddings are
+    persisted in ``embeddings.npz`` so each description is only embedded once,
+    and entry metadata is indexed in memory on the first semantic lookup.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, semantic=False, threshold=SIMILARITY_THRESHOLD):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.semantic = semantic
+        self.threshold = threshold
+        self.embeddings_file = self.cache_dir / "embeddings.npz"
+        self._model = None
+        # sha256(description) -> L2-normalized embedding, persisted across runs
+        self._embeddings = None
+        self._embeddings_dirty = False
+        self._embeddings_lock = threading.Lock()
+        # path -> entry without its raw output, for semantic lookups
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    def make_key(self, agent, task):
+        payload = json.dumps({
+            "role": agent.role,
+            "goal": agent.goal,
+            "backstory": agent.backstory,
+            "model": _model_name(agent),
+            "desc": task.description,
+            "expected": task.expected_output,
+            "ctx": context_chain(task)
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, agent, task):
+        """Return the cached raw output for this agent/task, or None."""
+        entry = self._read(self.cache_dir / f"{self.make_key(agent, task)}.json")
+        if entry is not None:
+            return entry["raw"]
+        if self.semantic:
+            return self._semantic_get(agent, task)
+        return None
+
+    def set(self, agent, task, raw):
+        entry = dict(self._match_fields(agent, task), description=task.description, raw=raw)
+        path = self.cache_dir / f"{self.make_key(agent, task)}.json"
+        self._write(path, json.dumps(entry).encode("utf-8"))
+        with self._index_lock:
+            if self._index is not None:
+                self._index[path] = {k: v for k, v in entry.items() if k != "raw"}
+        if self.semantic:
+            self._embedding(task.description)
+            self._save_embeddings()
+
+    def _read(self, path):
+        """The entry stored at ``path``, or None if it is missing or unreadable."""
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return entry if isinstance(entry, dict) and "raw" in entry else None
+
+    def _write(self, path, data):
+        # Write to a temporary file and rename it into place, so concurrent
+        # readers and interrupted runs never see a partially written file
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def preload(self, descriptions):
+        """Embed the known task descriptions up front so lookups never wait on the model."""
+        if not self.semantic:
+            return
+        for description in descriptions:
+            self._embedding(description)
+        self._save_embeddings()
+
+    def _embedding(self, description):
+        with self._embeddings_lock:
+            if self._embeddings is None:
+                import numpy as np
+                try:
+                    with np.load(self.embeddings_file) as data:
+                        self._embeddings = dict(data)
+                except Exception:
+                    # Missing or corrupt; descriptions are re-embedded on demand
+                    self._embeddings = {}
+            key = hashlib.sha256(description.encode("utf-8")).hexdigest()
+            if key not in self._embeddings:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(EMBEDDING_MODEL)
+                self._embeddings[key] = self._model.encode(description, normalize_embeddings=True)
+                self._embeddings_dirty = True
+            return self._embeddings[key]
+
+    def _save_embeddings(self):
+        with self._embeddings_lock:
+            if self._embeddings_dirty:
+                import numpy as np
+                buffer = io.BytesIO()
+                np.savez(buffer, **self._embeddings)
+                self._write(self.embeddings_file, buffer.getvalue())
+                self._embeddings_dirty = False
+
+    def _semantic_index(self):
+        with self._index_lock:
+            if self._index is None:
+                self._index = {}
+                for path in self.cache_dir.glob("*.json"):
+                    entry = self._read(path)
+                    if entry:
+                        self._index[path] = {k: v for k, v in entry.items() if k != "raw"}
+            return dict(self._index)
+
+    def _match_fields(self, agent, task):
+        """Everything in the exact key except the description, which is matched semantically."""
+        return {
+            "role": agent.role,
+            "goal": agent.goal,
+            "backstory": agent.backstory,
+            "model": _model_name(agent),
+            "expected_output": task.expected_output,
+            "ctx_chain": context_chain(task)
+        }
+
+    def _candidates(self, agent, task):
+        """(description, path) of the entries a semantic hit may be taken from.
+
+        A similar description is only a valid hit if it was answered by the
+        same persona and model, for the same expected output, from the same
+        upstream outputs; otherwise those changes would be ignored.
+        """
+        required = self._match_fields(agent, task)
+        return [
+            (entry["description"], path)
+            for path, entry in self._semantic_index().items()
+            if all(entry.get(field) == value for field, value in required.items())
+        ]
+
+    def _semantic_get(self, agent, task):
+        candidates = self._candidates(agent, task)
+        if not candidates:
+            return None
+
+        import numpy as np
+        query = self._embedding(task.description)
+        matrix = np.stack([self._embedding(description) for description, _ in candidates])
+        self._save_embeddings()
+        scores = matrix @ query
+        best = int(scores.argmax())
+        if scores[best] <= self.threshold:
+            return None
+        entry = self._read(candidates[best][1])
+        return entry["raw"] if entry else None
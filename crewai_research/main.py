@@ -1,39 +1,155 @@
-import os
+import asyncio
+import contextlib
+import functools
+import io
+import logging
+import re
+import threading
 from datetime import datetime
+from pathlib import Path
 from crewai import Crew, Process
-from agents import BasketballLeagueAgents
+from agents import BasketballLeagueAgents, verbose_enabled
 from tasks import BasketballLeagueTasks
+from perf_config import PerfConfig, get_config, set_config
 from dotenv import load_dotenv
 import sys
 
 # Load environment variables
 load_dotenv()
 
-class OutputCapture:
-    def __init__(self, filename):
-        self.terminal = sys.stdout
-        self.log = open(filename, 'w', encoding='utf-8')
+# Report sections in crew task order: (heading, name used when output is missing)
+REPORT_SECTIONS = [
+    ("Market Research Analysis", "Market research"),
+    ("User Research & Personas", "User research"),
+    ("Technical Architecture", "Technical architecture"),
+    ("Compliance & Safety Requirements", "Compliance"),
+    ("Feature Prioritization", "Feature prioritization"),
+    ("UI Design System", "UI design"),
+    ("Business Model & Monetization", "Business model")
+]
+
+log = logging.getLogger("crew").info
+
+def toc_anchor(number, heading):
+    """Markdown anchor of the "## {number}. {heading}" report section."""
+    return re.sub(r"[^a-z0-9 -]", "", f"{number} {heading}".lower()).replace(" ", "-")
+
+class TeeIO(io.TextIOBase):
+    """Copies writes to the terminal and the full log a whole line at a time.
+
+    Each thread's text is held until a newline, so output from concurrently
+    running agents, streamed tokens included, never interleaves mid-line.
+    close() emits whatever any thread left unfinished.
+    """
+
+    def __init__(self, terminal, log_file):
+        self.terminal = terminal
+        self.log_file = log_file
+        self.lock = threading.Lock()
+        # Unfinished line of each writing thread; keyed on the Thread object
+        # because ids of finished threads are reused
+        self.pending = {}
     
     def write(self, message):
-        self.terminal.write(message)
-        self.log.write(message)
+        thread = threading.current_thread()
+        with self.lock:
+            lines, newline, rest = (self.pending.pop(thread, "") + message).rpartition("\n")
+            if rest:
+                self.pending[thread] = rest
+            if newline:
+                self._emit(lines + newline)
+        return len(message)
     
     def flush(self):
-        self.terminal.flush()
-        self.log.flush()
+        # Emits this thread's unfinished line too
+        with self.lock:
+            self._emit(self.pending.pop(threading.current_thread(), ""))
+            self.log_file.flush()
     
     def close(self):
-        self.log.close()
+        """Emit every thread's unfinished line and flush; the wrapped streams stay open."""
+        if self.closed:
+            return
+        with self.lock:
+            for text in self.pending.values():
+                self._emit(text + "\n")
+            self.pending.clear()
+            self.log_file.flush()
+        super().close()
+    
+    def _emit(self, text):
+        # Callers hold self.lock
+        self.terminal.write(text)
+        self.terminal.flush()
+        self.log_file.write(text)
+
+def build_layers(tasks):
+    """Group tasks into layers whose context only points at earlier layers."""
+    layers = []
+    scheduled = []
+    pending = list(tasks)
+    while pending:
+        layer = [
+            task for task in pending
+            if all(any(dep is done for done in scheduled) for dep in (task.context or []))
+        ]
+        if not layer:
+            raise ValueError("Task context dependencies contain a cycle or an unknown task")
+        layers.append(layer)
+        scheduled.extend(layer)
+        pending = [task for task in pending if not any(task is ready for ready in layer)]
+    return layers
+
+async def run_wavefront(tasks, inputs=None, parallel=True):
+    """Start each task, as a single-task crew, as soon as its context tasks finish.
+
+    With ``parallel=False`` the tasks run one at a time, layer by layer in
+    dependency order, whatever order the list is in.
 
-def main():
-    print("🏀 Starting Basketball League Management App Research...")
-    print("=" * 60)
+    If a task fails, tasks that have not started yet are cancelled and the
+    error is raised. Crews already running in worker threads cannot be
+    interrupted; their current LLM calls finish and the results are dropped.
+    """
+    finished = {id(task): asyncio.Event() for task in tasks}
     
-    # Set up output capture
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    full_output_filename = f"basketball_research_FULL_{timestamp}.txt"
-    sys.stdout = OutputCapture(full_output_filename)
+    async def run_when_ready(task):
+        await asyncio.gather(*[finished[id(dep)].wait() for dep in task.context or []])
+        # Tasks already hydrated (e.g. from a batch job) are not re-run
+        if not task.output:
+            crew = Crew(
+                agents=[task.agent],
+                tasks=[task],
+                process=Process.sequential,
+                verbose=verbose_enabled()
+            )
+            await crew.kickoff_async(inputs=inputs or {})
+        finished[id(task)].set()
     
+    if not parallel:
+        for layer in build_layers(tasks):
+            for task in layer:
+                await run_when_ready(task)
+        return
+    runs = [asyncio.ensure_future(run_when_ready(task)) for task in tasks]
+    try:
+        await asyncio.gather(*runs)
+    except BaseException:
+        for run in runs:
+            run.cancel()
+        await asyncio.gather(*runs, return_exceptions=True)
+        raise
+
+@functools.lru_cache(maxsize=None)
+def task_cache():
+    """The LLMCache shared by every crew in this process, or None if it is off."""
+    config = get_config()
+    if not config.task_cache:
+        return None
+    from cache import LLMCache
+    return LLMCache(semantic=config.semantic_cache)
+
+def create_crew():
+    """Build a fresh set of research agents, tasks and crew."""
     # Initialize agents
     agents = BasketballLeagueAgents()
     market_researcher = agents.market_researcher()
@@ -44,8 +160,9 @@ def main():
     business_strategist = agents.business_strategist()
     ui_designer = agents.ui_designer()  # NEW UI Designer
     
-    # Initialize tasks
-    tasks = BasketballLeagueTasks()
+    # Initialize tasks, reusing cached results from earlier runs
+    cache = task_cache()
+    tasks = BasketballLeagueTasks(cache=cache)
     
     # Create tasks
     market_research = tasks.market_research_task(market_researcher)
@@ -70,18 +187,6 @@ def main():
         context=[market_research, user_research, feature_prioritization]
     )
     
-    # Store all tasks for output collection
-    all_tasks = [
-        market_research,
-        user_research,
-        technical_requirements,
-        compliance_review,
-        feature_prioritization,
-        ui_design,  # NEW task
-        business_model
-    ]
-    
-    # Create crew
     crew = Crew(
         agents=[
             market_researcher,
@@ -92,103 +197,152 @@ def main():
             ui_designer,  # NEW agent
             business_strategist
         ],
-        tasks=all_tasks,
+        tasks=[
+            market_research,
+            user_research,
+            technical_requirements,
+            compliance_review,
+            feature_prioritization,
+            ui_design,  # NEW task
+            business_model
+        ],
         process=Process.sequential,
-        verbose=True,
-        full_output=True
+        verbose=verbose_enabled()
     )
+    if cache:
+        cache.preload([task.description for task in crew.tasks])
+    return crew
+
+@functools.lru_cache(maxsize=None)
+def build_crew():
+    """Build the research agents, tasks and crew once per process.
+
+    The performance config is read on the first call only; later set_config()
+    calls do not affect the cached crew.
+    """
+    return create_crew()
+
+async def run_crew(inputs=None, crew=None):
+    """Run the crew's tasks as their dependencies allow and return the last task's output."""
+    crew = crew or build_crew()
+    for task in crew.tasks:
+        task.output = None
+    
+    # Layering validates the dependency graph (no cycles, no unknown tasks)
+    # and yields the context-free tasks; execution itself is a wavefront.
+    config = get_config()
+    layers = build_layers(crew.tasks)
+    if config.batch_api:
+        from batch import BatchCrewRunner
+        pending = [task for task in layers[0] if not task.reuse_cached()]
+        if pending:
+            log("📦 Submitting independent tasks to the Batch API (this can take a while)...")
+            # Polling blocks, so keep it off the event loop
+            for task in await asyncio.to_thread(BatchCrewRunner().run, pending):
+                task.remember(task.agent, task.output)
+    await run_wavefront(crew.tasks, inputs, parallel=config.parallel_dispatch)
+    return crew.tasks[-1].output
+
+async def run_batch(inputs_list, pool_size=4):
+    """Run the crew once per input and return the results in input order.
+
+    At most ``pool_size`` crews are built, once each. Every pool crew works
+    through the queued inputs one at a time, which bounds both construction
+    and the number of runs in flight however long the input list is.
+    """
+    queue = asyncio.Queue()
+    for index, inputs in enumerate(inputs_list):
+        queue.put_nowait((index, inputs))
+    results = [None] * len(inputs_list)
+    
+    async def work(crew):
+        while not queue.empty():
+            index, inputs = queue.get_nowait()
+            results[index] = await run_crew(inputs, crew)
+    
+    pool = [create_crew() for _ in range(min(pool_size, len(inputs_list)))]
+    await asyncio.gather(*[work(crew) for crew in pool])
+    return results
+
+async def research(timestamp, full_output_filename):
+    log("🏀 Starting Basketball League Management App Research...")
+    log("=" * 60)
+    
+    sections = [
+        (heading, missing, task)
+        for (heading, missing), task in zip(REPORT_SECTIONS, build_crew().tasks)
+    ]
     
     # Execute the crew
-    print("\n🚀 Executing research crew with UI Designer... This may take 12-18 minutes.")
-    print(f"📝 Full output is being saved to: {full_output_filename}\n")
+    log("\n🚀 Executing research crew with UI Designer... This may take 12-18 minutes.")
+    log(f"📝 Full output is being saved to: {full_output_filename}\n")
     
+    result = None
     try:
-        result = crew.kickoff()
+        result = await run_crew()
         
         # Create comprehensive markdown report
         markdown_filename = f"basketball_league_COMPLETE_research_{timestamp}.md"
-        with open(markdown_filename, "w", encoding="utf-8") as f:
-            f.write("# Basketball League Management App - Complete Research Report\n\n")
-            f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write("=" * 80 + "\n\n")
-            f.write("## Table of Contents\n\n")
-            f.write("1. [Market Research Analysis](#1-market-research-analysis)\n")
-            f.write("2. [User Research & Personas](#2-user-research--personas)\n")
-            f.write("3. [Technical Architecture](#3-technical-architecture)\n")
-            f.write("4. [Compliance & Safety Requirements](#4-compliance--safety-requirements)\n")
-            f.write("5. [Feature Prioritization](#5-feature-prioritization)\n")
-            f.write("6. [UI Design System](#6-ui-design-system)\n")
-            f.write("7. [Business Model & Monetization](#7-business-model--monetization)\n\n")
-            f.write("=" * 80 + "\n\n")
-            
-            # Try to get individual task outputs
-            f.write("## 1. Market Research Analysis\n\n")
-            if hasattr(market_research, 'output') and market_research.output:
-                f.write(str(market_research.output) + "\n\n")
-            else:
-                f.write("*Market research output not captured - check full log file*\n\n")
-            
-            f.write("=" * 80 + "\n\n")
-            f.write("## 2. User Research & Personas\n\n")
-            if hasattr(user_research, 'output') and user_research.output:
-                f.write(str(user_research.output) + "\n\n")
-            else:
-                f.write("*User research output not captured - check full log file*\n\n")
-            
-            f.write("=" * 80 + "\n\n")
-            f.write("## 3. Technical Architecture\n\n")
-            if hasattr(technical_requirements, 'output') and technical_requirements.output:
-                f.write(str(technical_requirements.output) + "\n\n")
-            else:
-                f.write("*Technical architecture output not captured - check full log file*\n\n")
-            
-            f.write("=" * 80 + "\n\n")
-            f.write("## 4. Compliance & Safety Requirements\n\n")
-            if hasattr(compliance_review, 'output') and compliance_review.output:
-                f.write(str(compliance_review.output) + "\n\n")
-            else:
-                f.write("*Compliance output not captured - check full log file*\n\n")
-            
-            f.write("=" * 80 + "\n\n")
-            f.write("## 5. Feature Prioritization\n\n")
-            if hasattr(feature_prioritization, 'output') and feature_prioritization.output:
-                f.write(str(feature_prioritization.output) + "\n\n")
-            else:
-                f.write("*Feature prioritization output not captured - check full log file*\n\n")
-            
-            f.write("=" * 80 + "\n\n")
-            f.write("## 6. UI Design System\n\n")
-            if hasattr(ui_design, 'output') and ui_design.output:
-                f.write(str(ui_design.output) + "\n\n")
-            else:
-                f.write("*UI design output not captured - check full log file*\n\n")
-            
-            f.write("=" * 80 + "\n\n")
-            f.write("## 7. Business Model & Monetization\n\n")
-            if result:
-                f.write(str(result) + "\n\n")
+        parts = [
+            "# Basketball League Management App - Complete Research Report\n\n",
+            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n",
+            "=" * 80 + "\n\n",
+            "## Table of Contents\n\n"
+        ]
+        for number, (heading, _, _) in enumerate(sections, 1):
+            parts.append(f"{number}. [{heading}](#{toc_anchor(number, heading)})\n")
+        parts.append("\n" + "=" * 80 + "\n\n")
+        
+        # Individual task outputs
+        for number, (heading, missing, task) in enumerate(sections, 1):
+            parts.append(f"## {number}. {heading}\n\n")
+            if task.output:
+                parts.append(str(task.output) + "\n\n")
             else:
-                f.write("*Business model output not captured - check full log file*\n\n")
-            
-            f.write("=" * 80 + "\n\n")
-            f.write("## End of Report\n\n")
-            f.write(f"For complete details including agent reasoning, see: {full_output_filename}\n")
+                parts.append(f"*{missing} output not captured - check full log file*\n\n")
+            parts.append("=" * 80 + "\n\n")
+        
+        parts.append("## End of Report\n\n")
+        parts.append(f"For complete details including agent reasoning, see: {full_output_filename}\n")
+        Path(markdown_filename).write_bytes("".join(parts).encode("utf-8"))
         
-        print("\n" + "=" * 60)
-        print(f"✅ Research completed with UI Design!")
-        print(f"📄 Complete Markdown report: {markdown_filename}")
-        print(f"📝 Full output log: {full_output_filename}")
-        print("=" * 60)
+        log("\n" + "=" * 60)
+        log(f"✅ Research completed with UI Design!")
+        log(f"📄 Complete Markdown report: {markdown_filename}")
+        log(f"📝 Full output log: {full_output_filename}")
+        log("=" * 60)
         
     except Exception as e:
-        print(f"\n❌ Error occurred: {str(e)}")
-        print("Partial results may have been saved.")
-    finally:
-        # Restore normal output
-        sys.stdout.close()
-        sys.stdout = sys.__stdout__
+        log(f"\n❌ Error occurred: {str(e)}")
+        log("Partial results may have been saved.")
     
     return result
 
+async def main_async():
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    full_output_filename = f"basketball_research_FULL_{timestamp}.txt"
+    
+    # Our messages go through logging and crewai's output (including streamed
+    # tokens) through stdout; both end up in the same locked tee
+    with open(full_output_filename, 'w', encoding='utf-8', buffering=1 << 20) as log_file:
+        tee = TeeIO(sys.stdout, log_file)
+        handler = logging.StreamHandler(tee)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger = logging.getLogger("crew")
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        try:
+            with contextlib.redirect_stdout(tee):
+                return await research(timestamp, full_output_filename)
+        finally:
+            # The tee's log file closes with this block; leave no handler on it
+            logger.removeHandler(handler)
+            handler.close()
+            tee.close()
+
+def main(argv=None):
+    set_config(PerfConfig.from_args(argv))
+    return asyncio.run(main_async())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
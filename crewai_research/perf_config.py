@@ -0,0 +1,87 @@
+import argparse
+import os
+from dataclasses import dataclass, fields, replace
+
+# Environment variable behind each flag; "1" turns it on, "0" turns it off
+ENV_VARS = {
+    "task_cache": "CREW_CACHE",
+    "semantic_cache": "CREW_SEMANTIC_CACHE",
+    "batch_api": "CREW_BATCH_API",
+    "parallel_dispatch": "CREW_PARALLEL",
+    "prompt_cache": "CREW_PROMPT_CACHE",
+    "streaming": "CREW_STREAMING",
+    "verbose": "CREW_VERBOSE",
+}
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+FALSE_VALUES = ("0", "false", "no", "off")
+
+def parse_flag(name, value):
+    """Read an environment flag, rejecting values that are neither on nor off."""
+    if value.strip().lower() in TRUE_VALUES:
+        return True
+    if value.strip().lower() in FALSE_VALUES:
+        return False
+    raise ValueError(f"{name} must be one of {TRUE_VALUES + FALSE_VALUES}, got {value!r}")
+
+@dataclass(frozen=True)
+class PerfConfig:
+    """Switches for the optional performance features and verbose crew logging.
+
+    The defaults keep a plain run light: nothing here imports numpy,
+    sentence-transformers or the batch client unless its flag is on.
+    """
+    task_cache: bool = True
+    semantic_cache: bool = False
+    batch_api: bool = False
+    parallel_dispatch: bool = True
+    prompt_cache: bool = True
+    streaming: bool = True
+    verbose: bool = False
+
+    @classmethod
+    def from_env(cls, environ=None):
+        environ = os.environ if environ is None else environ
+        values = {}
+        for field in fields(cls):
+            value = environ.get(ENV_VARS[field.name])
+            if value is not None:
+                values[field.name] = parse_flag(ENV_VARS[field.name], value)
+        return cls(**values)
+
+    @classmethod
+    def from_args(cls, argv=None):
+        """Environment settings, overridden by --[no-]<flag> command line options."""
+        parser = argparse.ArgumentParser(description="Basketball league research crew")
+        try:
+            config = cls.from_env()
+        except ValueError as e:
+            parser.error(str(e))
+        for field in fields(cls):
+            parser.add_argument(
+                f"--{field.name.replace('_', '-')}",
+                action=argparse.BooleanOptionalAction,
+                default=getattr(config, field.name),
+                help=f"(env {ENV_VARS[field.name]})"
+            )
+        args = parser.parse_args(argv)
+        return replace(config, **{field.name: getattr(args, field.name) for field in fields(cls)})
+
+_active = None
+
+def get_config():
+    """The configuration in effect, read from the environment on first use."""
+    global _active
+    if _active is None:
+        _active = PerfConfig.from_env()
+    return _active
+
+def set_config(config):
+    """Make ``config`` the active configuration.
+
+    Call this before the crew is first built: main.build_crew() is cached per
+    process, so agents and tasks keep the streaming, prompt and task cache
+    settings that were active when it first ran.
+    """
+    global _active
+    _active = config
@@ -1,8 +1,76 @@
+import logging
+from typing import Any, Optional
+from pydantic import Field
 from crewai import Task
+from crewai.tasks.task_output import TaskOutput
+
+# What the agent executor returns when it runs out of iterations without an answer
+STOPPED_OUTPUT = "Agent stopped due to iteration limit or time limit."
+
+class MemoTask(Task):
+    """Task that reuses an earlier result instead of calling its agent again.
+
+    Results live in the LLMCache, keyed on the agent persona and model, the
+    task and the exact upstream outputs, so a re-run only short-circuits when
+    nothing the task depends on has changed.
+    """
+    cache: Optional[Any] = Field(default=None, exclude=True)
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        agent = agent or self.agent
+        if self.reuse_cached(agent):
+            return self.output
+        output = super().execute_sync(agent, context, tools)
+        self.remember(agent, output)
+        return output
+
+    def reuse_cached(self, agent=None):
+        """Set the output from the task cache if it holds a result; return whether it did."""
+        agent = agent or self.agent
+        if agent is None or self.cache is None:
+            return False
+        raw = self.cache.get(agent, self)
+        if raw is None:
+            return False
+        # Cached results never expire, so make reuse visible
+        logging.getLogger("crew").info(
+            f"♻️  {agent.role}: reusing cached result (--no-task-cache to refresh)"
+        )
+        self._reuse(agent, raw)
+        return True
+
+    def remember(self, agent, output):
+        """Store an output produced for this task, e.g. by a batch job, in the task cache."""
+        if self.cache is not None and output.raw.strip() != STOPPED_OUTPUT:
+            self.cache.set(agent, self, output.raw)
+
+    def _reuse(self, agent, raw):
+        self.agent = agent
+        self.output = TaskOutput(description=self.description, raw=raw, agent=agent.role)
+        return self.output
+
+def _depth(task):
+    return 1 + max((_depth(dep) for dep in task.context or []), default=-1)
+
+def _ordered_context(context):
+    """Drop repeated context tasks and sort the rest into one canonical order.
+
+    Upstream tasks come before the tasks built on them and ties are broken by
+    description, so every downstream prompt renders shared outputs in the
+    same byte order no matter how the context list was written.
+    """
+    unique = []
+    for task in context or []:
+        if not any(task is seen for seen in unique):
+            unique.append(task)
+    return sorted(unique, key=lambda task: (_depth(task), task.description))
 
 class BasketballLeagueTasks:
+    def __init__(self, cache=None):
+        self.cache = cache
+
     def market_research_task(self, agent):
-        return Task(
+        return MemoTask(
             description="""Conduct comprehensive market research on basketball league management platforms:
             
             1. Identify and analyze 10-15 existing solutions including:
@@ -25,11 +93,12 @@ class BasketballLeagueTasks:
             
             Provide a detailed competitive analysis matrix and market opportunity report.""",
             agent=agent,
+            cache=self.cache,
             expected_output="Comprehensive market analysis report with competitive matrix and opportunity identification"
         )
     
     def user_research_task(self, agent):
-        return Task(
+        return MemoTask(
             description="""Define user personas and journey maps for basketball league management:
             
             1. Create detailed personas for:
@@ -58,11 +127,12 @@ class BasketballLeagueTasks:
             
             Include accessibility considerations and multilingual needs.""",
             agent=agent,
+            cache=self.cache,
             expected_output="Detailed user personas and journey maps with pain points and opportunities"
         )
     
     def technical_requirements_task(self, agent):
-        return Task(
+        return MemoTask(
             description="""Design technical architecture for scalable basketball league platform:
             
             1. Platform Architecture:
@@ -93,11 +163,12 @@ class BasketballLeagueTasks:
             
             Provide technology stack recommendations with justifications.""",
             agent=agent,
+            cache=self.cache,
             expected_output="Complete technical architecture document with technology recommendations"
         )
     
     def feature_prioritization_task(self, agent, context):
-        return Task(
+        return MemoTask(
             description="""Create prioritized feature list based on research findings:
             
             1. Core MVP Features (Must Have):
@@ -126,12 +197,13 @@ class BasketballLeagueTasks:
             
             Consider Phoenix basketball league specific needs and requirements.""",
             agent=agent,
+            cache=self.cache,
             expected_output="Prioritized feature list with roadmap and implementation timeline",
-            context=context
+            context=_ordered_context(context)
         )
     
     def compliance_review_task(self, agent):
-        return Task(
+        return MemoTask(
             description="""Analyze compliance and safety requirements for youth basketball leagues:
             
             1. Legal Requirements:
@@ -166,11 +238,12 @@ class BasketballLeagueTasks:
             
             Provide compliance checklist and implementation recommendations.""",
             agent=agent,
+            cache=self.cache,
             expected_output="Comprehensive compliance requirements document with implementation guidelines"
         )
     
     def business_model_task(self, agent, context):
-        return Task(
+        return MemoTask(
             description="""Develop comprehensive business model and monetization strategy:
             
             1. Revenue Models Analysis:
@@ -208,12 +281,13 @@ class BasketballLeagueTasks:
             
             Provide detailed business plan with financial model.""",
             agent=agent,
+            cache=self.cache,
             expected_output="Complete business model with monetization strategy and financial projections",
-            context=context
+            context=_ordered_context(context)
         )
     
     def ui_design_task(self, agent, context):
-        return Task(
+        return MemoTask(
             description="""Create comprehensive UI design system and interface specifications:
             
             1. Visual Design System:
@@ -291,6 +365,7 @@ class BasketballLeagueTasks:
             
             Provide detailed UI specifications document with visual examples and implementation guidelines.""",
             agent=agent,
+            cache=self.cache,
             expected_output="Comprehensive UI design system documentation with component specifications and screen layouts",
-            context=context
+            context=_ordered_context(context)
         )
\ No newline at end of file
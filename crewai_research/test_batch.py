@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from batch import BatchCrewRunner
+
+class FakeClient:
+    """Batch API client whose batch is already finished with the given fields."""
+
+    def __init__(self, **batch):
+        self.batch = SimpleNamespace(id="batch_1", **batch)
+        self.files = SimpleNamespace(
+            create=lambda **kwargs: SimpleNamespace(id="file_1"),
+            content=lambda file_id: SimpleNamespace(text=self.content)
+        )
+        self.batches = SimpleNamespace(
+            create=lambda **kwargs: self.batch,
+            retrieve=lambda batch_id: self.batch
+        )
+        self.content = ""
+
+def make_task():
+    agent = SimpleNamespace(role="Market Research Analyst", goal="Analyze", backstory="- Researcher")
+    return SimpleNamespace(agent=agent, context=None, output=None, description="Research",
+                           prompt=lambda: "Research")
+
+def make_runner(monkeypatch, client):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    runner = BatchCrewRunner()
+    runner.client = client
+    return runner
+
+@pytest.mark.parametrize("batch", [
+    {"status": "expired", "output_file_id": None},
+    {"status": "completed", "output_file_id": None}
+])
+def test_unusable_batch_leaves_tasks_for_live_runs(monkeypatch, batch):
+    task = make_task()
+    assert make_runner(monkeypatch, FakeClient(**batch)).run([task]) == []
+    assert task.output is None
+
+def test_failed_requests_are_left_for_live_runs(monkeypatch):
+    client = FakeClient(status="completed", output_file_id="file_2")
+    client.content = "\n".join([
+        '{"custom_id": "0", "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "report"}}]}}}',
+        '{"custom_id": "1", "response": {"status_code": 500}}'
+    ])
+    done, failed = make_task(), make_task()
+    assert make_runner(monkeypatch, client).run([done, failed]) == [done]
+    assert done.output.raw == "report"
+    assert failed.output is None
@@ -0,0 +1,105 @@
+from types import SimpleNamespace
+
+import pytest
+
+from cache import LLMCache, context_chain
+
+def make_agent(model="gpt-4o"):
+    return SimpleNamespace(
+        role="Market Research Analyst",
+        goal="Analyze the market",
+        backstory="- Sports technology market researcher",
+        llm=SimpleNamespace(model_name=model)
+    )
+
+def make_task(description="Research the market", context=()):
+    return SimpleNamespace(
+        description=description,
+        expected_output="A report",
+        context=list(context),
+        output=None
+    )
+
+def finished(raw):
+    task = make_task(description=f"Upstream {raw}")
+    task.output = SimpleNamespace(raw=raw)
+    return task
+
+class UniformModel:
+    """Embeds every description identically, so any candidate is a perfect match."""
+
+    def encode(self, text, normalize_embeddings=True):
+        import numpy as np
+        return np.ones(4) / 2.0
+
+def test_context_chain_hashes_outputs_in_order():
+    upstream = [finished("a"), make_task()]
+    chain = context_chain(make_task(context=upstream))
+    assert len(chain[0]) == 64
+    assert chain[1] is None
+
+def test_exact_hit_round_trip(tmp_path):
+    cache = LLMCache(tmp_path)
+    agent, task = make_agent(), make_task()
+    assert cache.get(agent, task) is None
+    cache.set(agent, task, "report")
+    assert cache.get(agent, task) == "report"
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_key_covers_model(tmp_path):
+    cache = LLMCache(tmp_path)
+    task = make_task()
+    cache.set(make_agent("gpt-4o"), task, "report")
+    assert cache.get(make_agent("gpt-4o-mini"), task) is None
+
+def test_unreadable_entry_is_a_miss(tmp_path):
+    cache = LLMCache(tmp_path)
+    agent, task = make_agent(), make_task()
+    cache.set(agent, task, "report")
+    (tmp_path / f"{cache.make_key(agent, task)}.json").write_text('{"role": "Mar', encoding="utf-8")
+    assert cache.get(agent, task) is None
+
+def test_semantic_candidates_require_same_context_chain(tmp_path):
+    cache = LLMCache(tmp_path)
+    agent, upstream = make_agent(), finished("v1")
+    cache.set(agent, make_task(context=[upstream]), "report")
+    assert len(cache._candidates(agent, make_task("Research the market again", [upstream]))) == 1
+
+    upstream.output = SimpleNamespace(raw="v2")
+    assert cache._candidates(agent, make_task("Research the market again", [upstream])) == []
+
+def test_semantic_hit_rejected_when_context_chain_differs(tmp_path):
+    pytest.importorskip("numpy")
+    cache = LLMCache(tmp_path, semantic=True)
+    cache._model = UniformModel()
+    agent, upstream = make_agent(), finished("v1")
+    cache.set(agent, make_task(context=[upstream]), "report")
+
+    assert cache.get(agent, make_task("Research the market again", [upstream])) == "report"
+    assert cache.get(agent, make_task("Research the market again", [finished("v2")])) is None
+
+def test_semantic_candidates_require_same_persona(tmp_path):
+    cache = LLMCache(tmp_path)
+    cache.set(make_agent(), make_task(), "report")
+    agent = make_agent()
+    agent.backstory = "- Youth sports marketing specialist"
+    assert cache._candidates(agent, make_task()) == []
+    task = make_task()
+    task.expected_output = "A one-page summary"
+    assert cache._candidates(make_agent(), task) == []
+
+class NoModel:
+    def encode(self, text, normalize_embeddings=True):
+        raise AssertionError(f"re-embedded {text!r}")
+
+def test_embeddings_persist_across_runs(tmp_path):
+    np = pytest.importorskip("numpy")
+    first = LLMCache(tmp_path, semantic=True)
+    first._model = UniformModel()
+    first.preload(["Research the market", "Define personas"])
+    assert (tmp_path / "embeddings.npz").exists()
+
+    second = LLMCache(tmp_path, semantic=True)
+    second._model = NoModel()
+    second.preload(["Research the market", "Define personas"])
+    assert np.allclose(second._embedding("Define personas"), UniformModel().encode("Define personas"))
@@ -0,0 +1,97 @@
+import asyncio
+import io
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+import main
+from main import REPORT_SECTIONS, TeeIO, build_layers, run_wavefront, toc_anchor
+
+def make_task(name, context=None):
+    return SimpleNamespace(description=name, context=context)
+
+def test_build_layers_groups_by_dependency():
+    market, users = make_task("market"), make_task("users")
+    features = make_task("features", [market, users])
+    ui = make_task("ui", [users, features])
+    assert build_layers([market, users, features, ui]) == [[market, users], [features], [ui]]
+
+def test_build_layers_rejects_cycles():
+    first = make_task("first")
+    second = make_task("second", [first])
+    first.context = [second]
+    with pytest.raises(ValueError):
+        build_layers([first, second])
+
+def test_build_layers_rejects_unknown_context():
+    with pytest.raises(ValueError):
+        build_layers([make_task("features", [make_task("missing")])])
+
+def test_sequential_wavefront_follows_dependencies():
+    # Outputs are already set, so no crew runs; only the ordering is exercised
+    market = make_task("market")
+    features = make_task("features", [market])
+    market.output = features.output = "done"
+    asyncio.run(asyncio.wait_for(run_wavefront([features, market], parallel=False), timeout=5))
+
+def test_wavefront_stops_after_a_failure(monkeypatch):
+    started = []
+
+    class FakeCrew:
+        def __init__(self, tasks, **kwargs):
+            self.task = tasks[0]
+
+        async def kickoff_async(self, inputs):
+            started.append(self.task.description)
+            if self.task.description == "market":
+                raise RuntimeError("LLM call failed")
+            await asyncio.sleep(0.05)
+
+    async def run_and_keep_loop_alive(tasks):
+        # As in run_batch, the loop lives on after one run fails
+        with pytest.raises(RuntimeError):
+            await run_wavefront(tasks)
+        await asyncio.sleep(0.2)
+
+    monkeypatch.setattr(main, "Crew", FakeCrew)
+    market, compliance = make_task("market"), make_task("compliance")
+    features = make_task("features", [compliance])
+    for task in (market, compliance, features):
+        task.output, task.agent = None, None
+
+    asyncio.run(run_and_keep_loop_alive([market, compliance, features]))
+    assert "features" not in started
+
+def test_toc_anchors_match_section_headings():
+    anchors = [toc_anchor(number, heading) for number, (heading, _) in enumerate(REPORT_SECTIONS, 1)]
+    assert anchors == [
+        "1-market-research-analysis",
+        "2-user-research--personas",
+        "3-technical-architecture",
+        "4-compliance--safety-requirements",
+        "5-feature-prioritization",
+        "6-ui-design-system",
+        "7-business-model--monetization"
+    ]
+
+def test_tee_keeps_lines_whole_and_drains_every_thread():
+    terminal, log_file = io.StringIO(), io.StringIO()
+    tee = TeeIO(terminal, log_file)
+
+    def stream(name):
+        for token in [name, " says", " hi\n", name, " stops"]:
+            tee.write(token)
+
+    workers = [threading.Thread(target=stream, args=(name,)) for name in ("ann", "bob")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    tee.close()
+
+    lines = sorted(terminal.getvalue().splitlines())
+    assert lines == ["ann says hi", "ann stops", "bob says hi", "bob stops"]
+    assert log_file.getvalue() == terminal.getvalue()
@@ -0,0 +1,33 @@
+import pytest
+
+from perf_config import PerfConfig
+
+def test_defaults(monkeypatch):
+    for name in ("CREW_CACHE", "CREW_SEMANTIC_CACHE", "CREW_BATCH_API",
+                 "CREW_PARALLEL", "CREW_PROMPT_CACHE", "CREW_STREAMING", "CREW_VERBOSE"):
+        monkeypatch.delenv(name, raising=False)
+    assert PerfConfig.from_args([]) == PerfConfig()
+
+def test_from_env():
+    config = PerfConfig.from_env({"CREW_CACHE": "0", "CREW_BATCH_API": "1"})
+    assert not config.task_cache
+    assert config.batch_api
+    assert config.streaming
+
+def test_args_override_env(monkeypatch):
+    monkeypatch.setenv("CREW_STREAMING", "0")
+    monkeypatch.setenv("CREW_SEMANTIC_CACHE", "1")
+    config = PerfConfig.from_args(["--streaming", "--no-task-cache"])
+    assert config.streaming
+    assert config.semantic_cache
+    assert not config.task_cache
+
+def test_env_accepts_common_spellings():
+    config = PerfConfig.from_env({"CREW_STREAMING": "true", "CREW_PARALLEL": "Off", "CREW_VERBOSE": "yes"})
+    assert config.streaming
+    assert not config.parallel_dispatch
+    assert config.verbose
+
+def test_env_rejects_unknown_values():
+    with pytest.raises(ValueError, match="CREW_STREAMING"):
+        PerfConfig.from_env({"CREW_STREAMING": "enabled"})
@@ -0,0 +1,20 @@
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("crewai")
+
+from tasks import _ordered_context
+
+def make_task(name, context=None):
+    return SimpleNamespace(description=name, context=context)
+
+def test_ordered_context_is_canonical():
+    market, users = make_task("market"), make_task("users")
+    features = make_task("features", [market, users])
+    expected = [market, users, features]
+    assert _ordered_context([features, users, market]) == expected
+    assert _ordered_context([users, features, market, users]) == expected
+
+def test_ordered_context_handles_none():
+    assert _ordered_context(None) == []